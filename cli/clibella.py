@@ -1,7 +1,6 @@
 """Library for consistent and visually appealing terminal output."""
 
 import sys
-from re import compile
 
 import colorama
 from colorama import Fore, Style
@@ -18,28 +17,49 @@ class _Prefix:
         Text displayed as a prefix for a message.
     color : colorama color constant
         Color in which the prefix text will be highlighted.
+    padded_text : str
+        The prefix text, centered to the length of the longest prefix.
+    colored_prefix : str
+        The complete colored prefix string, as prepended to output.
+    plain_prefix : str
+        The complete uncolored prefix string, as prepended to output.
     """
 
     # This class variable holds all created Prefix objects.
     _all_prefixes = []
+    # This class variable holds the length of the longest prefix text.
+    _max_length = 0
 
     def __init__(self, prefix_text, colorama_color):
         self.text = prefix_text
         self.color = colorama_color
         _Prefix._all_prefixes.append(self)
 
-    def get_max_length():
+        if len(prefix_text) > _Prefix._max_length:
+            # all prefixes share the same width, so re-render existing ones
+            _Prefix._max_length = len(prefix_text)
+            for prefix in _Prefix._all_prefixes:
+                prefix._render()
+        else:
+            self._render()
+
+    def _render(self):
+        """Precomputes the padded, colored and plain prefix strings."""
+
+        self.padded_text = self.text.center(_Prefix._max_length)
+        self.colored_prefix = (
+            f"[{self.color}{self.padded_text}{Style.RESET_ALL}] "
+        )
+        self.plain_prefix = f"[{self.padded_text}] "
+
+    @classmethod
+    def get_max_length(cls):
         """Returns the number of characters of the longest existing prefix.
 
         If no prefixes exist, returns 0.
         """
 
-        longest_prefix_length = 0
-        for prefix in _Prefix._all_prefixes:
-            if len(prefix.text) > longest_prefix_length:
-                longest_prefix_length = len(prefix.text)
-
-        return longest_prefix_length
+        return max((len(prefix.text) for prefix in cls._all_prefixes), default=0)
 
 
 _prefix_info = _Prefix("INFO", Fore.WHITE)
@@ -51,24 +71,27 @@ _prefix_warning = _Prefix("WARNING", Fore.YELLOW)
 _prefix_error = _Prefix("ERROR", Fore.RED)
 _prefix_failure = _Prefix("FAILURE", Fore.RED)
 
+# Answers accepted by Printer.prompt_yes_or_no (compared case-insensitively).
+_YES = frozenset({"y", "yes"})
+_NO = frozenset({"n", "no"})
+
+# Whether colorama has been initialized by any Printer yet.
+_colorama_initialized = False
+
 
 class Printer:
     """Printer objects print prefixed output to the specified output stream."""
 
-    # These class variables are needed to keep track of whether colorama has
-    # been initialized.
-    _num_of_active_printers = 0
-    _colorama_previously_initialized = False
-
     def __init__(self, file=sys.stdout):
         """Constructs a Printer object and sets its default behaviour.
 
-        If the created Printer is the first printer that has been created,
-        colorama is initialized.
-        If the newly created Printer is the only printer in existence, but
-        other Printers have existed previously (as indicated by the
-        '_colorama_previously_initialized' class variable), colorama is
-        re-initialized.
+        Colored output is only used if the Printer's file is a TTY. Printers
+        writing to anything else (pipes, regular files) print plain prefixes
+        instead. Input prompts are always written to stdout, so their
+        prefixes are colored only if stdout is a TTY.
+        colorama is initialized once, by the first Printer which uses color
+        for either of them, and stays initialized for the lifetime of the
+        process.
 
         Parameters
         ----------
@@ -77,30 +100,16 @@ class Printer:
             stdout).
         """
 
-        # check if colorama needs to be initialized
-        if not Printer._colorama_previously_initialized:
-            colorama.init()
-            Printer._colorama_previously_initialized = True
-        else:
-            if Printer._num_of_active_printers == 0:
-                colorama.reinit()
-
-        Printer._num_of_active_printers += 1
+        global _colorama_initialized
 
         self.file = file
+        self._use_color = hasattr(file, "isatty") and file.isatty()
+        self._use_color_for_input = sys.stdout.isatty()
 
-    def __del__(self):
-        """Deconstructs a Printer object.
-
-        If the deleted Printer is the last one in existence, colorama is
-        de-initialized.
-        """
-
-        # check if colorama should be de-initialized
-        if Printer._num_of_active_printers == 1:
-            colorama.deinit()
-
-        Printer._num_of_active_printers -= 1
+        if ((self._use_color or self._use_color_for_input)
+                and not _colorama_initialized):
+            colorama.init()
+            _colorama_initialized = True
 
     def _print_prefixed_output(self, prefix, *args, color_enabled=True,
                                **kwargs):
@@ -126,16 +135,26 @@ class Printer:
             the exception of the "file" argument.
         """
 
-        prefix_str = ""
-        prefix_text = prefix.text.center(_Prefix.get_max_length())
-
-        if color_enabled:
-            prefix_str = f"[{prefix.color}{prefix_text}{Style.RESET_ALL}] "
+        if color_enabled and self._use_color:
+            prefix_str = prefix.colored_prefix
         else:
-            prefix_str = f"[{prefix_text}] "
-
-        print(prefix_str, end='', sep='', file=self.file)
-        print(*args, **kwargs, file=self.file)
+            prefix_str = prefix.plain_prefix
+
+        # join everything into a single string, so that only one write is
+        # issued to the (possibly colorama-wrapped) output stream
+        sep = kwargs.pop("sep", None)
+        if sep is None:
+            sep = " "
+        end = kwargs.pop("end", None)
+        if end is None:
+            end = "\n"
+
+        print(
+            prefix_str + sep.join(map(str, args)) + end,
+            end='',
+            file=self.file,
+            **kwargs
+        )
 
     def _get_prefixed_input(self, prefix, *args, color_enabled=True, **kwargs):
         """Prints the input prompt with the specified prefix prepended.
@@ -159,15 +178,12 @@ class Printer:
             the exception of the "file" argument.
         """
 
-        prefix_str = ""
-        prefix_text = prefix.text.center(_Prefix.get_max_length())
-
-        if color_enabled:
-            prefix_str = f"[{prefix.color}{prefix_text}{Style.RESET_ALL}] "
+        if color_enabled and self._use_color_for_input:
+            prefix_str = prefix.colored_prefix
         else:
-            prefix_str = f"[{prefix_text}] "
+            prefix_str = prefix.plain_prefix
 
-        print(prefix_str, end='', sep='', file=sys.stdout)
+        sys.stdout.write(prefix_str)
         return input(*args, **kwargs)
 
     def info(self, *args, color_enabled=True, **kwargs):
@@ -366,15 +382,13 @@ class Printer:
 
         user_input_is_valid = False
 
-        regex_yes = compile(r"^(y)$|^(Y)$|^(YES)$|^(Yes)$|^(yes)$")
-        regex_no = compile(r"^(n)$|^(N)$|^(NO)$|^(No)$|^(no)$")
-
         while(not user_input_is_valid):
             user_input = self.input(f"{question} (Yes/No): ")
+            answer = user_input.strip().lower()
 
-            if (regex_yes.match(user_input)):
+            if (answer in _YES):
                 return True
-            elif (regex_no.match(user_input)):
+            elif (answer in _NO):
                 return False
             elif (not ask_until_valid):
                 return None
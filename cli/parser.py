@@ -1,10 +1,23 @@
 """Commandline argument parsing utilities."""
 
 from argparse import ArgumentParser
+from functools import lru_cache
+from pathlib import Path
 
 
+def _path(path_string):
+    """Converts a commandline path argument into an absolute Path."""
+
+    return Path(path_string).expanduser().resolve()
+
+
+@lru_cache(maxsize=1)
 def get_argument_parser():
-    """Sets up an argparse ArgumentParser and returns it."""
+    """Sets up an argparse ArgumentParser and returns it.
+
+    The parser is built on the first call only, subsequent calls return the
+    same ArgumentParser object.
+    """
 
     mainparser = ArgumentParser(
         description="Debian ISO preseeding tool.",
@@ -16,7 +29,7 @@ def get_argument_parser():
         "-o",
         "--output-file",
         action='store',
-        type=str,
+        type=_path,
         dest='path_to_output_file',
         metavar='OUTPUTFILE',
         help="File as which the retrieved/generated file will be saved",
@@ -25,7 +38,7 @@ def get_argument_parser():
         "-O",
         "--output-dir",
         action='store',
-        type=str,
+        type=_path,
         dest='path_to_output_dir',
         metavar='OUTPUTDIR',
         help="Directory into which the retrieved/generated file will be written",
@@ -64,7 +77,7 @@ def get_argument_parser():
     subparser_inject.add_argument(
         "FILES",
         action='store',
-        type=str,
+        type=_path,
         nargs='+',
         metavar='FILES',
         help="Paths to all input files you want to inject",
@@ -73,7 +86,7 @@ def get_argument_parser():
         "-i",
         "--image-file",
         action='store',
-        type=str,
+        type=_path,
         dest='path_to_image_file',
         metavar='IMAGEFILE',
         help="Path to the ISO you want to modify",
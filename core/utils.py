@@ -1,20 +1,46 @@
-"""A collection of general utilities, not specific to any module."""
+"""A collection of general utilities, not specific to any module.
 
-from crypt import crypt, METHOD_SHA512
-from getpass import getpass
-from os import remove, rename
+Imports of heavier modules (colorama, requests, gpg wrappers) are deferred
+to the functions which need them, so that importing this module stays cheap
+for commandline invocations which never use them.
+"""
+
+from os import fspath, replace, scandir
+from os.path import expanduser
 from pathlib import Path
-from subprocess import run, STDOUT, PIPE
+from shutil import which
 from sys import exit
 from tempfile import TemporaryDirectory
 
-from cli.clibella import Printer
 from core.exceptions import MissingDependencyError
-from gpg.exceptions import VerificationFailedError
-from gpg.keystore import debian_signing_key_is_imported, import_debian_signing_key
-from gpg.verify import assert_detached_signature_is_valid
-from net.download import download_file
-from net.scrape import get_debian_iso_urls
+
+
+def normalize_path(path):
+    """Returns the input path as an absolute Path with '~' expanded.
+
+    Absolute Path objects are assumed to be normalized already (e.g. by an
+    earlier call to this function) and are returned unchanged, which saves
+    the filesystem lookups of resolving them again.
+
+    Parameters
+    ----------
+    path : str or pathlike object
+        The path to normalize.
+
+    Examples
+    --------
+    path_to_iso = normalize_path("~/downloads/debian-11.iso")
+
+    """
+
+    if isinstance(path, Path) and path.is_absolute():
+        return path
+
+    path = fspath(path)
+    if "~" in path:
+        path = expanduser(path)
+
+    return Path(path).resolve()
 
 
 def hash_user_password(printer=None):
@@ -24,50 +50,58 @@ def hash_user_password(printer=None):
     d-i passwd/root-password-crypted PASSWORDHASH
     """
 
+    from crypt import crypt, METHOD_SHA512
+    from getpass import getpass
+    from hmac import compare_digest
+
+    from cli.clibella import Printer
+
     if printer is None:
         p = Printer()
     else:
         if not isinstance(printer, Printer):
             raise TypeError(f"Expected a {type(Printer)} object.")
+        p = printer
 
     password = getpass("Enter a password: ")
     password_confirmed = getpass("Enter the password again: ")
-    if not password_confirmed == password:
+    if not compare_digest(password_confirmed.encode(), password.encode()):
         p.failure("Passwords did not match")
         return
 
     p.info("Password hash:")
     p.info(crypt(password, METHOD_SHA512))
 
-def assert_system_dependencies_installed():
-    """Checks whether all system dependencies required by udib are installed.
+def assert_system_dependencies_installed(programs):
+    """Checks whether the specified system dependencies are installed.
 
     The programs used by udib must be accessible within the system's PATH
     environment variable.
 
+    Parameters
+    ----------
+    programs : list of str
+        The names of the programs to look for.
+
     Raises
     ------
     MissingDependencyError
         If a required dependency is not installed.
     """
 
-    _REQUIRED_PROGRAMS = [
-        "xorriso", "gpg", "cpio", "sha512sum",
-    ]
-
-    for program in _REQUIRED_PROGRAMS:
-        try:
-            run(["command", "-v", program], shell=True, check=True)
-        except subprocess.CalledProcessError:
+    for program in programs:
+        if which(program) is None:
             raise MissingDependencyError(
                 f"Program not installed or not in $PATH: "
                 f"'{program}'."
             )
 
-def find_all_files_under(parent_dir):
-    """Recursively finds all files anywhere under the specified directory.
+def iter_files_under(parent_dir):
+    """Recursively iterates over all files under the specified directory.
 
-    Returns a list of absolute Path objects. Symlinks are ignored.
+    Yields a tuple of two strings for each file: the file's absolute path,
+    and its path relative to the parent directory. Symlinks are ignored.
+    Files are yielded in no particular order.
 
     Parameters
     ----------
@@ -81,92 +115,72 @@ def find_all_files_under(parent_dir):
 
     Examples
     --------
-    config_files = find_all_files_under("~/.config")
+    for path, relative_path in iter_files_under("~/.config"):
+        print(relative_path)
 
     """
 
-    if "~" in str(parent_dir):
-        parent_dir = Path(parent_dir).expanduser()
-    parent_dir = Path(parent_dir).resolve()
+    parent_dir = normalize_path(parent_dir)
 
     if not parent_dir.is_dir():
         raise NotADirectoryError(f"No such directory: '{parent_dir}'.")
 
-    files = []
+    def walk():
+        # walk the tree iteratively, reusing the file type information
+        # returned by scandir instead of issuing a separate stat for every
+        # entry, and building relative paths alongside the absolute ones
+        dirs_to_visit = [(str(parent_dir), "")]
+        while dirs_to_visit:
+            dir_path, dir_relative_path = dirs_to_visit.pop()
+            with scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.is_symlink():
+                        continue
+                    relative_path = dir_relative_path + entry.name
+                    if entry.is_file(follow_symlinks=False):
+                        yield entry.path, relative_path
+                    elif entry.is_dir(follow_symlinks=False):
+                        dirs_to_visit.append((entry.path, relative_path + "/"))
+
+    return walk()
 
-    for subpath in parent_dir.iterdir():
-        if subpath.is_file():
-            files.append(subpath.resolve())
-        elif not subpath.is_symlink() and subpath.is_dir():
-            files += find_all_files_under(subpath)
 
-    return files
-
-
-def trim_text_file(path_to_input_file, substring):
-    """Removes all lines not containing the substring from the input file.
+def find_all_files_under(parent_dir):
+    """Recursively finds all files anywhere under the specified directory.
 
-    The input file is overwritten.
-    If the substring is the empty string, no action is taken.
-    If the substring contains a newline, no action is taken.
-    If the substring does not match any line of the file, the resulting file
-    will be left empty.
+    Returns a list of absolute Path objects. Symlinks are ignored.
 
     Parameters
     ----------
-    path_to_input_file : str or pathlike object
-        The file to trim.
-    substring : str
-        The string to filter for.
-    """
-
-    if not isinstance(substring, str):
-        raise TypeError("Expected a string.")
-    if "\n" in substring or len(substring) == 0:
-        return
-
-    if "~" in str(path_to_input_file):
-        path_to_input_file = Path(path_to_input_file).expanduser()
-    path_to_input_file = Path(path_to_input_file).resolve()
-
-    if not path_to_input_file.is_file():
-        raise FileNotFoundError(f"No such file: '{path_to_input_file}'.")
-
-    # remove unwanted lines from hash file
-    input_file = open(path_to_input_file, "r")
-    input_file_lines = input_file.readlines()
-    input_file_lines_to_keep = []
-    for line in input_file_lines:
-        if substring in line:
-            input_file_lines_to_keep.append(line)
-    input_file.close()
-    remove(path_to_input_file)
-    with open(path_to_input_file, "w") as input_file:
-        input_file.writelines(input_file_lines_to_keep)
-
-
-def file_is_empty(path_to_input_file):
-    """Checks whether the input file is empty or not."""
+    parent_dir : str or pathlike object
+        The directory under which to recursively find files.
 
-    if "~" in str(path_to_input_file):
-        path_to_input_file = Path(path_to_input_file).expanduser()
-    path_to_input_file = Path(path_to_input_file).resolve()
+    Raises
+    ------
+    NotADirectoryError
+        Raised if the specified parent directory is not a directory.
 
-    if not path_to_input_file.is_file():
-        raise FileNotFoundError(f"No such file: '{path_to_input_file}'.")
+    Examples
+    --------
+    config_files = find_all_files_under("~/.config")
 
-    with open(path_to_input_file, 'r') as input_file:
-        # try to read a byte
-        file_has_content = len(input_file.read(1)) > 0
+    """
 
-    return not file_has_content
+    return [Path(path) for path, _ in iter_files_under(parent_dir)]
 
 
 def download_and_verify_debian_iso(path_to_output_file, printer=None):
     """Downloads the latest Debian ISO as the specified output file.
 
-    The file's integrity is validated using a SHA512 checksum.
+    The file's integrity is validated using a SHA512 checksum, which is
+    computed while the file is being downloaded.
     The PGP signature of the SHA512SUMS file is checked using gpg.
+    If the output file already exists and matches the verified checksum, it
+    is kept and the download is skipped.
+    The image is downloaded as a '.part' file named after the image release
+    next to the output file, which is moved into place once it has been
+    verified. If the download gets interrupted, the next call resumes it from
+    where it left off.
 
     Attributes
     ----------
@@ -174,48 +188,77 @@ def download_and_verify_debian_iso(path_to_output_file, printer=None):
         Path to the file as which the downloaded image will be saved.
     printer : clibella.Printer
         A CLI printer to be used for output.
+
+    Raises
+    ------
+    FileExistsError
+        If the output path exists and is not a regular file, or is a file
+        which does not match the verified checksum of the image.
     """
 
-    if "~" in str(path_to_output_file):
-        path_to_output_file = Path(path_to_output_file).expanduser()
-    path_to_output_file = Path(path_to_output_file).resolve()
+    from concurrent.futures import ThreadPoolExecutor
+    from hashlib import sha512
+
+    from cli.clibella import Printer
+    from gpg.exceptions import VerificationFailedError
+    from gpg.keystore import (
+        debian_signing_key_is_imported, import_debian_signing_key
+    )
+    from gpg.verify import assert_detached_signature_is_valid
+    from net.download import download_file
+    from net.scrape import get_debian_iso_urls
+
+    path_to_output_file = normalize_path(path_to_output_file)
 
-    if path_to_output_file.is_file():
-        raise FileExistsError(
-            f"Output file '{path_to_output_file}' already exists."
-        )
     if not path_to_output_file.parent.is_dir():
         raise NotADirectoryError(
             f"No such directory: '{path_to_output_file.parent}'."
         )
+    # only an existing regular file can be checked against the image's hash
+    if path_to_output_file.exists() and not path_to_output_file.is_file():
+        raise FileExistsError(
+            f"Output file '{path_to_output_file}' already exists."
+        )
 
     if printer is None:
         printer = Printer()
 
-    # create a temporary directory
+    # create a temporary directory for the hash and signature files
     with TemporaryDirectory() as temp_dir:
-        # scrape for URLs and filenames
+        # look up URLs and filenames
         files = get_debian_iso_urls()
 
         # set file paths
         path_to_hash_file = Path(temp_dir)/files["hash_file"]["name"]
         path_to_signature_file = Path(temp_dir)/files["signature_file"]["name"]
-        path_to_image_file = Path(temp_dir)/files["image_file"]["name"]
-
-        # download hash file and signature, and verify with gpg
-        download_file(
-            path_to_hash_file,
-            files["hash_file"]["url"],
-            show_progress=False,
-            printer=printer,
-        )
-        download_file(
-            path_to_signature_file,
-            files["signature_file"]["url"],
-            show_progress=False,
-            printer=printer,
+        # the image is downloaded next to the output file, named after the
+        # versioned image file, so that an interrupted download is only ever
+        # resumed with the bytes of the same image release
+        path_to_image_file = path_to_output_file.with_name(
+            files["image_file"]["name"] + ".part"
         )
 
+        # download hash file and signature concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            downloads = [
+                executor.submit(
+                    download_file,
+                    path_to_hash_file,
+                    files["hash_file"]["url"],
+                    show_progress=False,
+                    printer=printer,
+                ),
+                executor.submit(
+                    download_file,
+                    path_to_signature_file,
+                    files["signature_file"]["url"],
+                    show_progress=False,
+                    printer=printer,
+                ),
+            ]
+            for download in downloads:
+                download.result()
+
         # verify the hash file using gpg
         printer.info("Verifying hash file using gpg...")
         if not debian_signing_key_is_imported():
@@ -233,33 +276,53 @@ def download_and_verify_debian_iso(path_to_output_file, printer=None):
             exit(1)
         printer.ok("HASH file PGP authenticity check passed.")
 
-        # remove all lines from hash file not containing the image file name
-        trim_text_file(path_to_hash_file, files["image_file"]["name"])
-        if file_is_empty(path_to_hash_file):
+        # look up the image file's hash sum in the verified hash file
+        image_file_name = files["image_file"]["name"]
+        expected_image_hash = None
+        with open(path_to_hash_file, "r") as hash_file:
+            for line in hash_file:
+                fields = line.split()
+                if (len(fields) == 2
+                        and fields[1].lstrip("*") == image_file_name):
+                    expected_image_hash = fields[0].lower()
+                    break
+        if expected_image_hash is None:
             raise RuntimeError("Failed to locate SHA512 hash sum for image.")
 
-        # download image file
+        # keep an existing output file if it is the verified image already
+        if path_to_output_file.is_file():
+            printer.info("Checking existing ISO file integrity...")
+            existing_image_hash = sha512()
+            with open(path_to_output_file, "rb") as existing_image_file:
+                while data := existing_image_file.read(1 << 20):
+                    existing_image_hash.update(data)
+            if existing_image_hash.hexdigest() != expected_image_hash:
+                raise FileExistsError(
+                    f"Output file '{path_to_output_file}' does not match the "
+                    f"verified SHA512 checksum of '{image_file_name}'."
+                )
+            printer.ok("Existing ISO file matches, skipping download.")
+            return
+
+        # download image file, hashing it on the fly, and continuing a
+        # previously interrupted download if there is one
+        image_hash = sha512()
         download_file(
             path_to_image_file,
             files["image_file"]["url"],
             show_progress=True,
             printer=printer,
+            hasher=image_hash,
+            resume=True,
+            file_name=files["image_file"]["name"],
         )
 
         # validate SHA512 checksum
         printer.info("Validating ISO file integrity...")
-        hash_check_result = run(
-            [
-                "sha512sum", "--check", path_to_hash_file
-            ],
-            text=True,
-            stdout=PIPE,
-            stderr=STDOUT,
-            cwd=path_to_image_file.parent,
-        )
-        if hash_check_result.returncode != 0:
+        if image_hash.hexdigest() != expected_image_hash:
+            path_to_image_file.unlink()
             raise RuntimeError("SHA512 checksum verification of the ISO failed.")
         printer.ok("ISO file integrity check passed.")
 
         # move downloaded file to specified destination
-        rename(path_to_image_file, path_to_output_file)
+        replace(path_to_image_file, path_to_output_file)
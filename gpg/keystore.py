@@ -7,6 +7,11 @@ from re import compile
 _DEBIAN_KEY_SERVER_HOSTNAME = "keyring.debian.org"
 _DEBIAN_CD_SIGNING_KEY_ID = "DA87E80D6294BE9B"
 
+# expected shell output of a local gpg lookup of an existing key
+_LOCAL_KEY_LOOKUP_OUTPUT_REGEX = compile(
+    r"\Apub .*\n *[0-9A-F]{40}\nuid .*\nsub .*\n\n\Z"
+)
+
 
 def import_debian_signing_key():
     """Imports the public debian CD signing key using gpg.
@@ -84,29 +89,13 @@ def debian_signing_key_is_imported():
         return False
 
     # verify existing key shell output using regex:
-    # it should contain six lines in the following format
-    expected_output_lines_regexes = [
-        compile(r"^pub .*$"),
-        compile(r"^ *[0-9A-F]{40}$"),
-        compile(r"^uid .*$"),
-        compile(r"^sub .*$"),
-        compile(r"^$"),
-        compile(r"^$"),
-    ]
-
-    actual_output_lines = process_result.stdout.split("\n")
-    if not len(actual_output_lines) == len(expected_output_lines_regexes):
+    # it should consist of a 'pub', fingerprint, 'uid' and 'sub' line,
+    # followed by an empty line
+    if not _LOCAL_KEY_LOOKUP_OUTPUT_REGEX.match(process_result.stdout):
         raise RuntimeError(
-            f"Unexpected line count in shell output while performing local"
+            f"Unexpected shell output format while performing local "
             f"GPG key lookup:\n"
             f"{process_result.stdout}"
         )
-    for i in range(4):
-        if not expected_output_lines_regexes[i].match(actual_output_lines[i]):
-            raise RuntimeError(
-                f"Unexpected shell output format while performing local"
-                f"GPG key lookup:\n"
-                f"{process_result.stdout}"
-            )
 
     return True
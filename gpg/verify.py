@@ -1,12 +1,20 @@
 """Utilities for verifying files using gpg."""
 
-from re import compile
-from pathlib import Path
-from subprocess import run, PIPE, STDOUT
+from subprocess import run, DEVNULL, PIPE
 
+from core.utils import normalize_path
 import gpg.exceptions as ex
 
 
+# machine-readable gpg status tokens checked during signature verification,
+# see doc/DETAILS in the gnupg sources
+_STATUS_PREFIX = b"[GNUPG:] "
+_GOOD_SIGNATURE_STATUS = b"GOODSIG"
+_BAD_SIGNATURE_STATUS = b"BADSIG"
+_MISSING_KEY_STATUS = b"NO_PUBKEY"
+_INVALID_SIGNATURE_STATUS = b"NODATA"
+
+
 def assert_detached_signature_is_valid(
         path_to_input_file,
         path_to_signature_file
@@ -31,17 +39,15 @@ def assert_detached_signature_is_valid(
     gpg.exceptions.MissingLocalKeyError
         If a key referenced by the signature file could not be found in the
         invoking user's local key store.
+    gpg.exceptions.InvalidSignatureError
+        If the signature file does not contain valid OpenPGP data.
     gpg.exceptions.VerificationFailedError
         If the gpg verification detects a bad signature.
     """
 
-    if '~' in str(path_to_input_file):
-        path_to_input_file = Path(path_to_input_file).expanduser()
-    path_to_input_file = Path(path_to_input_file).resolve()
+    path_to_input_file = normalize_path(path_to_input_file)
 
-    if '~' in str(path_to_signature_file):
-        path_to_signature_file = Path(path_to_signature_file).expanduser()
-    path_to_signature_file = Path(path_to_signature_file).resolve()
+    path_to_signature_file = normalize_path(path_to_signature_file)
 
     if not path_to_input_file.is_file():
         raise FileNotFoundError(
@@ -52,77 +58,39 @@ def assert_detached_signature_is_valid(
             f"No such file: '{path_to_signature_file}'."
         )
 
-    # execute a gpg verification as a shell command, redirecting stderr to
-    # stdout
+    # execute a gpg verification as a shell command, writing machine-readable
+    # status lines to stdout and discarding the human-readable (and
+    # locale-dependent) messages on stderr
     process_result = run(
         [
-            "gpg", "--verify", path_to_signature_file, path_to_input_file,
+            "gpg", "--status-fd", "1",
+            "--verify", path_to_signature_file, path_to_input_file,
         ],
         stdout=PIPE,
-        stderr=STDOUT,
-        text=True,
+        stderr=DEVNULL,
     )
-    output_lines = process_result.stdout.split("\n")
-    if len(output_lines) < 3:
-        raise ex.UnexpectedOutputException(
-            f"Unexpected output during gpg verification:\n"
-            f"{process_result.stdout}"
-        )
 
-    if process_result.returncode == 2:
-        # a missing local key causes return code 2
-        # and the following output on the third line:
-        missing_key_regex = compile(
-            r"^gpg: Can't check signature: No public key$"
-        )
-        # an invalid detached signature file causes return code 2
-        # and the following output on the first line:
-        invalid_signature_regex = compile(
-            r"^gpg: no valid OpenPGP data found.$"
-        )
+    status_keywords = set()
+    for line in process_result.stdout.splitlines():
+        if line.startswith(_STATUS_PREFIX):
+            status_keywords.add(line[len(_STATUS_PREFIX):].split(b" ", 1)[0])
 
-        if missing_key_regex.match(output_lines[2]):
-            raise ex.MissingLocalKeyError(
-                "Failed to verify gpg signature: no matching local key."
-            )
-        elif invalid_signature_regex.match(output_lines[0]):
-            raise ex.InvalidSignatureError(
-                "Invalid signature file."
-            )
-        else:
-            raise ex.UnexpectedOutputException(
-                f"Unexpected output during gpg verification:\n"
-                f"{process_result.stdout}"
-            )
-    elif process_result.returncode == 1:
-        # failed verification causes return code 1
-        # and the following output on line 3:
-        verification_failed_regex = compile(
-            r"^gpg: BAD signature from .*$"
+    if _BAD_SIGNATURE_STATUS in status_keywords:
+        raise ex.VerificationFailedError(
+            "gpg signature verification failed: BAD SIGNATURE!"
+        )
+    elif _MISSING_KEY_STATUS in status_keywords:
+        raise ex.MissingLocalKeyError(
+            "Failed to verify gpg signature: no matching local key."
         )
-        if not verification_failed_regex.match(output_lines[2]):
-            raise ex.UnexpectedOutputException(
-                f"Unexpected output during gpg verification:\n"
-                f"{process_result.stdout}"
-            )
-        else:
-            raise ex.VerificationFailedError(
-                "gpg signature verification failed: BAD SIGNATURE!"
-            )
-    elif process_result.returncode == 0:
-        # successful verification causes return code 0
-        # and the following output on line 3:
-        verification_successful_regex = compile(
-            r"^gpg: Good signature from .*$"
+    elif _INVALID_SIGNATURE_STATUS in status_keywords:
+        raise ex.InvalidSignatureError(
+            "Invalid signature file."
         )
-        if not verification_successful_regex.match(output_lines[2]):
-            raise ex.UnexpectedOutputException(
-                f"Unexpected output during gpg verification:\n"
-                f"{process_result.stdout}"
-            )
-    else:
+    elif (process_result.returncode != 0
+            or _GOOD_SIGNATURE_STATUS not in status_keywords):
         raise ex.UnexpectedOutputException(
-            f"Unexpected return code during gpg verification:\n"
-            f"{process_result.returncode}"
-            f"{process_result.stdout}"
+            f"Unexpected output during gpg verification "
+            f"(return code {process_result.returncode}):\n"
+            f"{process_result.stdout.decode(errors='replace')}"
         )
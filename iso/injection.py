@@ -7,16 +7,95 @@ local filesystem.
 
 """
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
-from tempfile import TemporaryDirectory
+from tempfile import TemporaryDirectory, mkstemp
 import gzip
 import hashlib
-import re
-import shutil
+import os
+import stat
+import string
 import subprocess
 
 from cli.clibella import Printer
-from core.utils import find_all_files_under
+from core.utils import iter_files_under, normalize_path
+
+
+# Size of the buffer through which files are read while hashing them.
+_HASH_BUFFER_SIZE = 1 << 20
+
+# Number of trailing stderr lines of a subprocess kept for error messages.
+_STDERR_TAIL_LINES = 20
+
+# Characters which are allowed in an ISO filesystem name.
+_FILESYSTEM_NAME_ALLOWED_CHARS = frozenset(
+    string.ascii_letters + string.digits + " ._-"
+)
+
+# RAM-backed directory preferred for temporary files, if it has enough space.
+_TMPFS_DIR = "/dev/shm"
+
+
+def _get_temp_dir_base(required_bytes):
+    """Returns the directory in which large temporary files should be created.
+
+    Returns the tmpfs mount at '/dev/shm' if it exists and has at least
+    'required_bytes' of free space, so that intermediate files are kept in
+    RAM. Otherwise returns None, which makes the tempfile module fall back to
+    its default temporary directory.
+
+    Parameters
+    ----------
+    required_bytes : int
+        Amount of free space needed in the temporary directory.
+    """
+
+    try:
+        stats = os.statvfs(_TMPFS_DIR)
+    except OSError:
+        return None
+
+    if stats.f_bavail * stats.f_frsize < required_bytes:
+        return None
+    return _TMPFS_DIR
+
+
+def _run(command):
+    """Runs the command, discarding all of its output except for errors.
+
+    The command gets no stdin and its stdout is discarded, so it never waits
+    on or writes to the terminal. Its stderr is read as it is produced,
+    and only the last few lines are kept, so that verbose programs such as
+    xorriso do not pile up their entire log in memory.
+
+    Parameters
+    ----------
+    command : list
+        The program and its arguments.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        Raised if the command exits with a non-zero return code. The
+        exception's stderr attribute holds the tail of the command's stderr.
+    """
+
+    with subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    ) as process:
+        stderr_tail = deque(process.stderr, maxlen=_STDERR_TAIL_LINES)
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(
+            process.returncode,
+            command,
+            stderr=b"".join(stderr_tail),
+        )
 
 
 def extract_iso(path_to_output_dir, path_to_input_file):
@@ -45,13 +124,9 @@ def extract_iso(path_to_output_dir, path_to_input_file):
 
     """
 
-    if "~" in str(path_to_output_dir):
-        path_to_output_dir = Path(path_to_output_dir).expanduser()
-    path_to_output_dir = Path(path_to_output_dir).resolve()
+    path_to_output_dir = normalize_path(path_to_output_dir)
 
-    if "~" in str(path_to_input_file):
-        path_to_input_file = Path(path_to_input_file).expanduser()
-    path_to_input_file = Path(path_to_input_file).resolve()
+    path_to_input_file = normalize_path(path_to_input_file)
 
     # check if paths are valid
     if not path_to_output_dir.is_dir():
@@ -59,34 +134,89 @@ def extract_iso(path_to_output_dir, path_to_input_file):
     if not path_to_input_file.is_file():
         raise FileNotFoundError(f"No such file: '{path_to_input_file}'.")
 
+    # ask the kernel to start reading the ISO into the page cache, so that
+    # disk reads overlap with xorriso's processing
+    if hasattr(os, "posix_fadvise"):
+        fd = os.open(path_to_input_file, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
     # extract file to destination
     try:
-        subprocess.run(
+        _run(
             [
                 "xorriso",
                 "-osirrox", "on",
                 "-indev", path_to_input_file,
                 "-extract", "/",
                 path_to_output_dir
-            ],
-            capture_output=True,
-            check=True
+            ]
         )
-    except subprocess.CalledProcessError:
+    except subprocess.CalledProcessError as e:
         raise RuntimeError(
-            f"An error occurred while extracting '{path_to_input_file}'."
+            f"An error occurred while extracting '{path_to_input_file}':\n"
+            f"{e.stderr.decode(errors='replace')}"
         )
 
 
+def _build_cpio_newc_archive(file_name, file_data, file_mode, file_mtime):
+    """Returns a 'newc' format cpio archive containing a single regular file.
+
+    The archive is terminated by the usual 'TRAILER!!!' entry, which makes it
+    a complete archive of its own.
+    Source: https://www.kernel.org/doc/html/latest/driver-api/early-userspace/buffer-format.html
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the file inside the archive.
+    file_data : bytes
+        Contents of the file.
+    file_mode : int
+        Permission bits of the file.
+    file_mtime : int
+        Modification time of the file, in seconds since the epoch.
+    """
+
+    def build_entry(name, data, mode, mtime, inode, nlink):
+        encoded_name = name.encode() + b"\0"
+        header = "070701" + "".join(
+            f"{field:08x}" for field in (
+                inode, mode, 0, 0, nlink, mtime, len(data),
+                0, 0, 0, 0, len(encoded_name), 0,
+            )
+        )
+        # both the header + name and the data are padded to 4-byte boundaries
+        return (
+            header.encode()
+            + encoded_name
+            + b"\0" * (-(len(header) + len(encoded_name)) % 4)
+            + data
+            + b"\0" * (-len(data) % 4)
+        )
+
+    return (
+        build_entry(
+            file_name, file_data, stat.S_IFREG | file_mode, file_mtime, 1, 1
+        )
+        + build_entry("TRAILER!!!", b"", 0, 0, 0, 1)
+    )
+
+
 def append_file_contents_to_initrd_archive(
         path_to_initrd_archive,
         path_to_input_file
 ):
     """Appends the input file to the specified initrd archive.
 
-    The initrd archive is extracted, the input file is appended, and
-    the initrd is repacked again.
-    Source: https://wiki.debian.org/DebianInstaller/Preseed/EditIso#Adding_a_Preseed_File_to_the_Initrd
+    The input file is packed into a separate gzip-compressed cpio archive,
+    which is appended to the initrd archive as an additional gzip member.
+    The kernel unpacks all concatenated archives in an initrd into the same
+    root filesystem, so the existing initrd contents never need to be
+    decompressed or recompressed.
+    Source: https://www.kernel.org/doc/html/latest/driver-api/early-userspace/buffer-format.html
 
     Parameters
     ----------
@@ -113,13 +243,9 @@ def append_file_contents_to_initrd_archive(
 
     """
 
-    if "~" in str(path_to_initrd_archive):
-        path_to_initrd_archive = Path(path_to_initrd_archive).expanduser()
-    path_to_initrd_archive = Path(path_to_initrd_archive).resolve()
+    path_to_initrd_archive = normalize_path(path_to_initrd_archive)
 
-    if "~" in str(path_to_input_file):
-        path_to_input_file = Path(path_to_input_file).expanduser()
-    path_to_input_file = Path(path_to_input_file).resolve()
+    path_to_input_file = normalize_path(path_to_input_file)
 
     # check if initrd file exists and has the correct name
     if not path_to_initrd_archive.is_file():
@@ -132,51 +258,63 @@ def append_file_contents_to_initrd_archive(
     if not path_to_input_file.is_file():
         raise FileNotFoundError(f"No such file: '{path_to_input_file}'.")
 
-    # make archive and its parent directory temporarily writable
+    # pack the input file into its own compressed cpio archive
+    input_file_stat = path_to_input_file.stat()
+    cpio_archive = _build_cpio_newc_archive(
+        path_to_input_file.name,
+        path_to_input_file.read_bytes(),
+        stat.S_IMODE(input_file_stat.st_mode),
+        int(input_file_stat.st_mtime),
+    )
+
+    # make archive temporarily writable
     path_to_initrd_archive.chmod(0o644)
-    path_to_initrd_archive.parent.chmod(0o755)
 
-    path_to_initrd_extracted = path_to_initrd_archive.with_suffix("")
+    # append the compressed archive as a new gzip member
+    with open(path_to_initrd_archive, "ab") as file_gz:
+        file_gz.write(gzip.compress(cpio_archive))
 
-    # extract archive in-place
-    with gzip.open(path_to_initrd_archive, "rb") as file_gz:
-        with open(path_to_initrd_extracted, "wb") as file_raw:
-            shutil.copyfileobj(file_gz, file_raw)
-    path_to_initrd_archive.unlink()
+    # revert write permissions from the archive
+    path_to_initrd_archive.chmod(0o444)
 
-    try:
-        # append contents of input_file to extracted archive using cpio
-        # NOTE cpio must be called from within the input file's parent
-        # directory, and the input file's name is piped into it
-        completed_process = subprocess.Popen(
-            [
-                "cpio", "-H", "newc", "-o", "-A",
-                "-F", str(path_to_initrd_extracted.resolve())
-            ],
-            cwd=path_to_input_file.resolve().parent,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        completed_process.communicate(
-            input=str(path_to_input_file.name).encode()
-        )
 
-    except subprocess.CalledProcessError:
-        raise RuntimeError(
-            f"Failed while appending contents of '{path_to_input_file}' to "
-            f"'{path_to_initrd_archive}'."
-        )
+def _new_md5():
+    """Returns a new MD5 hash object for non-cryptographic checksums.
 
-    # repack archive
-    with gzip.open(path_to_initrd_archive, "wb") as file_gz:
-        with open(path_to_initrd_extracted, "rb") as file_raw:
-            shutil.copyfileobj(file_raw, file_gz)
-    path_to_initrd_extracted.unlink()
+    The md5sum.txt file inside an ISO only guards against corruption, so MD5
+    is flagged as not being used for security. This keeps it available on
+    hosts whose OpenSSL runs in FIPS mode.
+    """
 
-    # revert write permissions from repacked archive and its parent dir
-    path_to_initrd_archive.chmod(0o444)
-    path_to_initrd_archive.parent.chmod(0o555)
+    return hashlib.md5(usedforsecurity=False)
+
+
+def _hash_file_md5(path_to_input_file):
+    """Returns the hex digest of the input file's MD5 hash.
+
+    The file is hashed in chunks through a fixed-size buffer, instead of
+    reading the (possibly very large) file into memory at once.
+    On Python 3.11 and newer, hashlib.file_digest() is used to do so.
+    Both the reads and the hash updates release the GIL, so this function
+    can be run in several threads in parallel.
+    """
+
+    with open(path_to_input_file, "rb", buffering=0) as file:
+        # the file is read front to back exactly once, let the kernel know so
+        # it can read ahead more aggressively
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(file, _new_md5).hexdigest()
+
+        buffer = bytearray(_HASH_BUFFER_SIZE)
+        buffer_view = memoryview(buffer)
+        md5hash = _new_md5()
+        while bytes_read := file.readinto(buffer):
+            md5hash.update(buffer_view[:bytes_read])
+
+    return md5hash.hexdigest()
 
 
 def regenerate_iso_md5sums_file(path_to_extracted_iso_root):
@@ -204,9 +342,7 @@ def regenerate_iso_md5sums_file(path_to_extracted_iso_root):
 
     """
 
-    if "~" in str(path_to_extracted_iso_root):
-        path_to_extracted_iso_root = Path(path_to_extracted_iso_root).expanduser()
-    path_to_extracted_iso_root = Path(path_to_extracted_iso_root).resolve()
+    path_to_extracted_iso_root = normalize_path(path_to_extracted_iso_root)
 
     # check if input path exists
     if not path_to_extracted_iso_root.is_dir():
@@ -216,38 +352,51 @@ def regenerate_iso_md5sums_file(path_to_extracted_iso_root):
 
     path_to_md5sum_file = path_to_extracted_iso_root/"md5sum.txt"
 
-    # make md5sum file and its parent dir temporarily writable
-    path_to_md5sum_file.chmod(0o644)
-    path_to_md5sum_file.parent.chmod(0o755)
-
-    # remove original md5sum.txt
-    path_to_md5sum_file.unlink()
-
     # create a new md5sum file:
     # structure: '<md5_hash>  path/to/file/relative/to/iso_root'
     # with one line per file, for each file anywhere under the ISO root folder.
     # Note the two spaces between hash and filepath!
 
-    # find all files
-    subpaths = find_all_files_under(path_to_extracted_iso_root)
-
-    with open(path_to_md5sum_file, "w") as md5sum_file:
-        for subpath in subpaths:
-            md5hash = hashlib.md5()
-            with open(subpath, "rb") as file:
-                # calculate md5 hash
-                md5hash.update(file.read())
-            md5sum_file.write(
-                md5hash.hexdigest()
-                + "  "
-                + str(subpath.relative_to(path_to_extracted_iso_root))
-                + "\n"
-            )
-
-    # revert write permissions from md5sum.txt and its parent dir
-    path_to_md5sum_file.chmod(0o444)
-    path_to_md5sum_file.parent.chmod(0o555)
+    # find all files except the md5sum file itself, sorted to keep the output
+    # order deterministic
+    files = sorted(
+        file for file in iter_files_under(path_to_extracted_iso_root)
+        if file[1] != path_to_md5sum_file.name
+    )
 
+    # make the md5sum file's parent dir temporarily writable
+    path_to_md5sum_file.parent.chmod(0o755)
+    try:
+        # write the new md5sum file next to the original one, then atomically
+        # replace the original, so that md5sum.txt is never missing or partial
+        temp_fd, path_to_temp_file = mkstemp(
+            dir=path_to_md5sum_file.parent,
+            prefix=".md5sum.",
+        )
+        try:
+            with os.fdopen(temp_fd, "w") as md5sum_file:
+                # hash the files in parallel, one worker thread per CPU core
+                with ThreadPoolExecutor(
+                    max_workers=os.cpu_count()
+                ) as executor:
+                    md5hashes = executor.map(
+                        _hash_file_md5,
+                        [path for path, _ in files],
+                    )
+                    for (_, relative_path), md5hash in zip(files, md5hashes):
+                        md5sum_file.write(
+                            md5hash + "  " + relative_path + "\n"
+                        )
+
+                os.fchmod(md5sum_file.fileno(), 0o444)
+            os.replace(path_to_temp_file, path_to_md5sum_file)
+        except BaseException:
+            # don't leave a partial md5sum file behind in the extracted ISO
+            os.unlink(path_to_temp_file)
+            raise
+    finally:
+        # revert write permissions from the md5sum file's parent dir
+        path_to_md5sum_file.parent.chmod(0o555)
 
 def extract_mbr_from_iso(path_to_output_file, path_to_source_iso):
     """Extracts the MBR-data from the ISO and writes it into the outputfile.
@@ -281,13 +430,9 @@ def extract_mbr_from_iso(path_to_output_file, path_to_source_iso):
 
     """
 
-    if "~" in str(path_to_output_file):
-        path_to_output_file = Path(path_to_output_file).expanduser()
-    path_to_output_file = Path(path_to_output_file).resolve()
+    path_to_output_file = normalize_path(path_to_output_file)
 
-    if "~" in str(path_to_source_iso):
-        path_to_source_iso = Path(path_to_source_iso).expanduser()
-    path_to_source_iso = Path(path_to_source_iso)
+    path_to_source_iso = normalize_path(path_to_source_iso)
 
     # make sure output file does not exist already
     if path_to_output_file.exists():
@@ -302,10 +447,14 @@ def extract_mbr_from_iso(path_to_output_file, path_to_source_iso):
         raise RuntimeError(
             f"Input file is not an image file: '{path_to_source_iso}'.")
 
-    # extract the MBR (first 432 Bytes) of the source ISO file
-    with open(path_to_source_iso, mode="r+b") as iso_file:
-        with open(path_to_output_file, mode="w+b") as mbr_file:
-            mbr_file.write(iso_file.read(432))
+    # extract the MBR (first 432 Bytes) of the source ISO file, opening the
+    # ISO read-only and reading without Python's buffered IO layer
+    iso_fd = os.open(path_to_source_iso, os.O_RDONLY)
+    try:
+        mbr_data = os.pread(iso_fd, 432, 0)
+    finally:
+        os.close(iso_fd)
+    path_to_output_file.write_bytes(mbr_data)
 
 
 def repack_iso(path_to_output_iso,
@@ -358,17 +507,11 @@ def repack_iso(path_to_output_iso,
 
     """
 
-    if "~" in str(path_to_output_iso):
-        path_to_output_iso = Path(path_to_output_iso).expanduser()
-    path_to_output_iso = Path(path_to_output_iso).resolve()
+    path_to_output_iso = normalize_path(path_to_output_iso)
 
-    if "~" in str(path_to_mbr_data_file):
-        path_to_mbr_data_file = Path(path_to_mbr_data_file).expanduser()
-    path_to_mbr_data_file = Path(path_to_mbr_data_file).resolve()
+    path_to_mbr_data_file = normalize_path(path_to_mbr_data_file)
 
-    if "~" in str(path_to_input_files_root_dir):
-        path_to_input_files_root_dir = Path(path_to_input_files_root_dir).expanduser()
-    path_to_input_files_root_dir = Path(path_to_input_files_root_dir).resolve()
+    path_to_input_files_root_dir = normalize_path(path_to_input_files_root_dir)
 
     # make sure output file does not exist yet
     if path_to_output_iso.exists():
@@ -384,16 +527,18 @@ def repack_iso(path_to_output_iso,
 
     # make sure specified filesystem name contains no illegal characters:
     # only alphanumeric, ' ', '.', '_' and '-' are allowed.
-    filesystem_name_invalid_char_regex = re.compile(r"[^\w .-]")
-    invalid_char_match = filesystem_name_invalid_char_regex.search(
-        created_iso_filesystem_name)
-    if invalid_char_match is not None:
+    invalid_char = next(
+        (char for char in created_iso_filesystem_name
+         if char not in _FILESYSTEM_NAME_ALLOWED_CHARS),
+        None,
+    )
+    if invalid_char is not None:
         raise RuntimeError(f"Invalid character in filesystem name: "
-                           f"'{invalid_char_match.group()[0]}'.")
+                           f"'{invalid_char}'.")
 
     # repack the ISO using xorriso
     try:
-        subprocess.run(
+        _run(
             [
                 "xorriso", "-as", "mkisofs",
                 "-r", "-V", created_iso_filesystem_name,
@@ -407,14 +552,13 @@ def repack_iso(path_to_output_iso,
                 "-e", "boot/grub/efi.img", "-no-emul-boot",
                 "-isohybrid-gpt-basdat", "-isohybrid-apm-hfsplus",
                 path_to_input_files_root_dir,
-            ],
-            capture_output=True,
-            check=True,
+            ]
         )
 
-    except subprocess.CalledProcessError:
+    except subprocess.CalledProcessError as e:
         raise RuntimeError(f"Failed while repacking ISO from source files: "
-                           f"'{path_to_input_files_root_dir}'.")
+                           f"'{path_to_input_files_root_dir}':\n"
+                           f"{e.stderr.decode(errors='replace')}")
 
 
 def inject_files_into_iso(
@@ -426,10 +570,11 @@ def inject_files_into_iso(
 ):
     """Injects the specified input files into the specified ISO file.
 
-    Extracts the input ISO into a temporary directory, then extracts the input
-    ISO's MBR into a temporary file, then appends the input files to the
-    extracted ISO's initrd, then regenerates the extracted ISO's internal MD5
-    hash list and finally repacks the extracted ISO into the output ISO.
+    Extracts the input ISO into a temporary directory while concurrently
+    extracting the input ISO's MBR into a temporary file, then appends the
+    input files to the extracted ISO's initrd, then regenerates the
+    extracted ISO's internal MD5 hash list and finally repacks the extracted
+    ISO into the output ISO.
 
     The input ISO file itself is left unchanged.
     The output ISO file is newly created.
@@ -447,15 +592,11 @@ def inject_files_into_iso(
     """
 
     # verify and resolve paths
-    if "~" in str(path_to_input_iso_file):
-        path_to_input_iso_file = Path(path_to_input_iso_file).expanduser()
-    path_to_input_iso_file = Path(path_to_input_iso_file).resolve()
+    path_to_input_iso_file = normalize_path(path_to_input_iso_file)
     if not path_to_input_iso_file.is_file():
         raise FileNotFoundError(f"No such file: '{path_to_input_iso_file}'.")
 
-    if "~" in str(path_to_output_iso_file):
-        path_to_output_iso_file = Path(path_to_output_iso_file).expanduser()
-    path_to_output_iso_file = Path(path_to_output_iso_file).resolve()
+    path_to_output_iso_file = normalize_path(path_to_output_iso_file)
     if path_to_output_iso_file.is_file():
         raise FileExistsError(f"Output file exists: '{path_to_input_iso_file}'.")
     if not path_to_output_iso_file.parent.is_dir():
@@ -464,9 +605,7 @@ def inject_files_into_iso(
     input_file_paths_old = input_file_paths.copy()
     input_file_paths = []
     for path in input_file_paths_old:
-        if "~" in str(path):
-            path = Path(path).expanduser()
-        path = Path(path).resolve()
+        path = normalize_path(path)
         if not path.is_file():
             raise FileNotFoundError(f"No such file: '{path}'.")
         input_file_paths.append(path)
@@ -479,56 +618,62 @@ def inject_files_into_iso(
             raise TypeError(f"Expected a {type(Printer)} object.")
         p = printer
 
-    # extract image file to a temporary directory
-    temp_extracted_iso_dir = TemporaryDirectory()
-    path_to_extracted_iso_dir = Path(temp_extracted_iso_dir.name)
-    p.info(f"Extracting contents of {path_to_input_iso_file.name}...")
-    extract_iso(
-        path_to_extracted_iso_dir,
-        path_to_input_iso_file
-    )
-    p.ok("ISO extraction complete.")
-
-    # extract ISO MBR into a temporary directory
-    p.info(f"Extracting MBR from {path_to_input_iso_file.name}...")
-    temp_mbr_dir = TemporaryDirectory()
-    path_to_mbr_dir = Path(temp_mbr_dir.name)
-    path_to_mbr_file = path_to_mbr_dir/"mbr.bin"
-    extract_mbr_from_iso(
-        path_to_mbr_file,
-        path_to_input_iso_file,
+    # the extracted ISO plus the modified initrd need about twice the space
+    # of the input ISO
+    temp_dir_base = _get_temp_dir_base(
+        2 * path_to_input_iso_file.stat().st_size
     )
-    p.ok("MBR extraction complete.")
-
-    # append all input files to the extracted ISO's initrd
-    temp_file_dir = TemporaryDirectory()
-    path_to_file_dir = Path(temp_file_dir.name)
-    for path_to_file in input_file_paths:
-        p.info(f"Appending {path_to_file.name} to initrd...")
-        path_to_file_copy = path_to_file_dir/path_to_file.name
-        shutil.copy(path_to_file, path_to_file_copy)
-        append_file_contents_to_initrd_archive(
-            path_to_extracted_iso_dir/"install.amd"/"initrd.gz",
-            path_to_file_copy
-        )
-        p.ok(f"{path_to_file.name} appended successfully.")
-
-    # regenerate extracted ISO's md5sum.txt file
-    p.info("Regenerating MD5 checksums...")
-    regenerate_iso_md5sums_file(path_to_extracted_iso_dir)
-    p.ok("MD5 calculations complete.")
 
-    # repack exctracted ISO into a single file
-    p.info("Repacking ISO...")
-    repack_iso(
-        path_to_output_iso_file,
-        path_to_mbr_file,
-        path_to_extracted_iso_dir,
-        iso_filesystem_name
-    )
+    with ExitStack() as temp_dirs:
+        # create temporary directories for the extracted image and its MBR
+        path_to_extracted_iso_dir = Path(temp_dirs.enter_context(
+            TemporaryDirectory(dir=temp_dir_base)
+        ))
+        path_to_mbr_dir = Path(temp_dirs.enter_context(
+            TemporaryDirectory(dir=temp_dir_base)
+        ))
+        path_to_mbr_file = path_to_mbr_dir/"mbr.bin"
+
+        # extract image file and ISO MBR concurrently, both only read from
+        # the input ISO and write to separate directories
+        p.info(f"Extracting contents of {path_to_input_iso_file.name}...")
+        p.info(f"Extracting MBR from {path_to_input_iso_file.name}...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            iso_extraction = executor.submit(
+                extract_iso,
+                path_to_extracted_iso_dir,
+                path_to_input_iso_file
+            )
+            mbr_extraction = executor.submit(
+                extract_mbr_from_iso,
+                path_to_mbr_file,
+                path_to_input_iso_file,
+            )
+            mbr_extraction.result()
+            p.ok("MBR extraction complete.")
+            iso_extraction.result()
+            p.ok("ISO extraction complete.")
+
+        # append all input files to the extracted ISO's initrd
+        for path_to_file in input_file_paths:
+            p.info(f"Appending {path_to_file.name} to initrd...")
+            append_file_contents_to_initrd_archive(
+                path_to_extracted_iso_dir/"install.amd"/"initrd.gz",
+                path_to_file
+            )
+            p.ok(f"{path_to_file.name} appended successfully.")
+
+        # regenerate extracted ISO's md5sum.txt file
+        p.info("Regenerating MD5 checksums...")
+        regenerate_iso_md5sums_file(path_to_extracted_iso_dir)
+        p.ok("MD5 calculations complete.")
+
+        # repack exctracted ISO into a single file
+        p.info("Repacking ISO...")
+        repack_iso(
+            path_to_output_iso_file,
+            path_to_mbr_file,
+            path_to_extracted_iso_dir,
+            iso_filesystem_name
+        )
     p.success(f"ISO file was created successfully at '{path_to_output_iso_file}'.")
-
-    # clear out temporary directories
-    temp_file_dir.cleanup()
-    temp_mbr_dir.cleanup()
-    temp_extracted_iso_dir.cleanup()
@@ -1,11 +1,34 @@
 """Library for downloading files from the web with CLI output."""
 
-from pathlib import Path
+from shutil import copyfileobj
 
-import requests
 from tqdm import tqdm
 
 from cli.clibella import Printer
+from core.utils import normalize_path
+import net.session
+
+
+# Number of bytes read from the network and written to disk at a time.
+_CHUNK_SIZE = 256 * 1024
+
+
+def _content_range_resumes_at(content_range, offset):
+    """Checks whether a Content-Range header covers the rest of a file.
+
+    Returns True if the header value has the form 'bytes OFFSET-END/TOTAL'
+    with END being the last byte of the TOTAL bytes, i.e. if the response
+    continues the file at the given offset and runs up to its end.
+    """
+
+    unit, _, byte_range = content_range.partition(" ")
+    span, _, total = byte_range.partition("/")
+    start, _, end = span.partition("-")
+    try:
+        return (unit == "bytes" and int(start) == offset
+                and int(end) + 1 == int(total))
+    except ValueError:
+        return False
 
 
 def download_file(
@@ -13,6 +36,10 @@ def download_file(
         url_to_file,
         show_progress=False,
         printer=None,
+        hasher=None,
+        session=None,
+        resume=False,
+        file_name=None,
 ):
     """Downloads the file at the input URL to the specified path.
 
@@ -30,17 +57,31 @@ def download_file(
         progress of the download.
     printer : clibella.Printer
         A clibella.Printer used to print CLI output.
+    hasher : hashlib hash object
+        If specified, the hash object is updated with the downloaded data
+        while it is being written, so that no second pass over the file is
+        needed to compute its checksum.
+    session : requests.Session
+        The session through which the file is requested. Defaults to the
+        session shared by all udib network requests.
+    resume : bool
+        When True and the output file already exists, it is treated as the
+        beginning of an interrupted download of the same file, and only the
+        remaining bytes are requested using an HTTP range request. If the
+        server does not honor the range, the file is downloaded from scratch.
+        If a hasher is specified, the existing bytes are fed into it first.
+    file_name : str
+        The name by which the file is announced in the CLI output. Defaults
+        to the name of the output file.
     """
 
-    if '~' in str(path_to_output_file):
-        path_to_output_file = Path(path_to_output_file).expanduser()
-    path_to_output_file = Path(path_to_output_file).resolve()
+    path_to_output_file = normalize_path(path_to_output_file)
 
     if not path_to_output_file.parent.is_dir():
         raise FileNotFoundError(
             f"No such directory: '{path_to_output_file.parent}'."
         )
-    if path_to_output_file.exists():
+    if path_to_output_file.exists() and not resume:
         raise FileExistsError(
             f"File already exists: '{path_to_output_file}'"
         )
@@ -50,30 +91,84 @@ def download_file(
     else:
         p = printer
 
-    output_file_name = path_to_output_file.name
-    with open(path_to_output_file, "wb") as output_file:
-        p.info(f"Downloading '{output_file_name}'...")
-        file_response = requests.get(url_to_file, stream=True)
-        total_length = file_response.headers.get('content-length')
+    if file_name is None:
+        output_file_name = path_to_output_file.name
+    else:
+        output_file_name = file_name
+    p.info(f"Downloading '{output_file_name}'...")
+
+    # continue a previous partial download if requested
+    resume_offset = 0
+    headers = {}
+    if resume and path_to_output_file.is_file():
+        resume_offset = path_to_output_file.stat().st_size
+        headers["Range"] = f"bytes={resume_offset}-"
 
-        if total_length is None:  # no content length header
-            output_file.write(file_response.content)
+    file_response = net.session.get(
+        url_to_file, session=session, headers=headers, stream=True
+    )
+
+    if resume_offset:
+        content_range = file_response.headers.get("content-range", "")
+        if not (file_response.status_code == 206
+                and _content_range_resumes_at(content_range, resume_offset)):
+            # the range was not honored, so start over with the full file
+            resume_offset = 0
+            if file_response.status_code != 200:
+                file_response.close()
+                file_response = net.session.get(
+                    url_to_file, session=session, stream=True
+                )
+
+    if resume_offset and hasher is not None:
+        with open(path_to_output_file, "rb") as partial_file:
+            while data := partial_file.read(_CHUNK_SIZE):
+                hasher.update(data)
+
+    output_file_mode = "ab" if resume_offset else "wb"
+    with open(path_to_output_file, output_file_mode) as output_file:
+        # read straight from the underlying urllib3 response, which avoids
+        # requests' per-chunk generator overhead and never holds the whole
+        # body in memory, even if the server sends no content length
+        file_response.raw.decode_content = True
+
+        if not show_progress and hasher is None:
+            copyfileobj(file_response.raw, output_file, _CHUNK_SIZE)
         else:
             if (show_progress):
-                total_length = int(total_length)
+                # without a content length header, tqdm shows an open-ended
+                # counter instead of a bar
+                total_length = file_response.headers.get('content-length')
+                if total_length is not None:
+                    total_length = int(total_length) + resume_offset
                 progress_bar = tqdm(
                     total=total_length,
+                    initial=resume_offset,
                     unit="B",
                     unit_scale=True,
                     unit_divisor=1024
                 )
 
-            for data in file_response.iter_content(chunk_size=4096):
-                output_file.write(data)
-                if (show_progress):
-                    progress_bar.update(len(data))
+            # decide once which consumers each chunk is handed to, instead of
+            # checking the options again for every chunk
+            chunk_consumers = [output_file.write]
+            if hasher is not None:
+                chunk_consumers.append(hasher.update)
+            if (show_progress):
+                chunk_consumers.append(
+                    lambda data: progress_bar.update(len(data))
+                )
+
+            # read into one reused buffer instead of allocating a new bytes
+            # object for every chunk
+            buffer = bytearray(_CHUNK_SIZE)
+            buffer_view = memoryview(buffer)
+            while bytes_read := file_response.raw.readinto(buffer):
+                data = buffer_view[:bytes_read]
+                for consume in chunk_consumers:
+                    consume(data)
 
             if (show_progress):
                 progress_bar.close()
 
-        p.ok(f"Received '{output_file_name}'.")
+    p.ok(f"Received '{output_file_name}'.")
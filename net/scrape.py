@@ -1,15 +1,35 @@
-"""Methods for scraping the debian website for specific file URLs."""
+"""Methods for looking up specific file URLs on the debian website."""
 
-from re import compile
+from functools import lru_cache
+from re import compile, MULTILINE
+from types import MappingProxyType
 
-import requests
-from bs4 import BeautifulSoup
+import net.session
+
+
+# line of the SHA512SUMS file listing the latest stable x86-64 netinst ISO
+_ISO_HASH_LINE_REGEX = compile(
+    rb"^[0-9a-f]{128}  (debian-[0-9.]+-amd64-netinst\.iso)$",
+    MULTILINE,
+)
+
+# URLs and file names of the debian example preseed files
+_PRESEED_FILE_URLS = MappingProxyType({
+    "basic": MappingProxyType({
+        "url": "https://www.debian.org/releases/stable/example-preseed.txt",
+        "name": "example-preseed.txt",
+    }),
+    "full": MappingProxyType({
+        "url": "https://preseed.debian.net/debian-preseed/bullseye/amd64-main-full.txt",
+        "name": "amd64-main-full.txt",
+    }),
+})
 
 
 def get_debian_preseed_file_urls():
-    """Returns a dict containing the URLs for the debian example preseed files.
+    """Returns a mapping of the URLs for the debian example preseed files.
 
-    The dict has the following structure:
+    The mapping has the following structure:
     {
         "basic": {
             "url": "https://...",
@@ -22,22 +42,13 @@ def get_debian_preseed_file_urls():
     }
     where "basic" points to the basic preseed file and its filename, and "full"
     points to the full preseed file and its filename.
+    The returned mapping is a read-only module constant.
     """
 
-    preseed_file_urls = {
-        "basic": {
-            "url": "https://www.debian.org/releases/stable/example-preseed.txt",
-            "name": "example-preseed.txt",
-        },
-        "full": {
-            "url": "https://preseed.debian.net/debian-preseed/bullseye/amd64-main-full.txt",
-            "name": "amd64-main-full.txt",
-        },
-    }
-
-    return preseed_file_urls
+    return _PRESEED_FILE_URLS
 
 
+@lru_cache(maxsize=1)
 def get_debian_iso_urls():
     """Retrieves a dict containing the URLs for a debian installation image.
 
@@ -64,32 +75,34 @@ def get_debian_iso_urls():
     Each top-level dict entry contains a "name" key representing a file name,
     and a "url" key specifying a URL to that file.
 
-    The function scrapes the official debian.org website to retrieve the URLs.
+    The function reads the image file's name from the SHA512SUMS file on the
+    official debian.org website, which is much smaller than the release
+    directory listing.
+    The result is cached for the lifetime of the process, so the website is
+    queried at most once. The returned dict is shared between callers and
+    must not be modified.
     """
 
-    # request the debian releases page
     releases_url = "https://cdimage.debian.org/debian-cd/current/amd64/iso-cd/"
-    releases_page = requests.get(releases_url)
-    if not releases_page.status_code == 200:
-        raise RuntimeError("Unexpected status code during request.")
 
     hash_file_name = "SHA512SUMS"
     hash_file_url = releases_url + hash_file_name
     signature_file_name = "SHA512SUMS.sign"
     signature_file_url = releases_url + signature_file_name
 
-    # find the exact URL to the latest stable x64 netinst ISO file
-    soup = BeautifulSoup(releases_page.content, "html.parser")
-    image_file_links = soup.find_all(
-        name="a",
-        string=compile(r"debian-[0-9.]*-amd64-netinst.iso")
-    )
-    if len(image_file_links) != 1:
+    # request the hash file, which lists every image of the release
+    hash_file = net.session.get(hash_file_url)
+    if not hash_file.status_code == 200:
+        raise RuntimeError("Unexpected status code during request.")
+
+    # find the exact name of the latest stable x64 netinst ISO file
+    image_file_names = _ISO_HASH_LINE_REGEX.findall(hash_file.content)
+    if len(image_file_names) != 1:
         raise RuntimeError(
             "Failed to find an exact match while looking for "
-            "a link to the latest debian image file."
+            "the name of the latest debian image file."
         )
-    image_file_name = image_file_links[0]['href']
+    image_file_name = image_file_names[0].decode()
     image_file_url = releases_url + image_file_name
 
     return {
@@ -0,0 +1,66 @@
+"""A shared HTTP session for all requests made by udib.
+
+All scraping and downloading goes to the same few hosts, so a single
+requests.Session is shared by the whole process. Its connection pool keeps
+the HTTPS connections open between requests, which saves a TCP and TLS
+handshake for every file fetched after the first one.
+"""
+
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Seconds to wait for a connection to be established, and for data to arrive.
+_TIMEOUT = (10, 30)
+
+
+@lru_cache(maxsize=1)
+def get_session():
+    """Returns the requests.Session shared by all udib network requests.
+
+    The session is created on first use. Failed connections and server
+    errors are retried a few times with exponential backoff.
+    """
+
+    retries = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=retries,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get(url, session=None, **kwargs):
+    """Sends a GET request through the shared session.
+
+    Works like requests.get(), but reuses pooled connections and applies a
+    default timeout unless one is specified explicitly.
+
+    Parameters
+    ----------
+    url : str
+        The URL to request.
+    session : requests.Session
+        A session to send the request through instead of the shared one.
+    **kwargs : various
+        The same keywords which requests.get() accepts.
+    """
+
+    if session is None:
+        session = get_session()
+
+    kwargs.setdefault("timeout", _TIMEOUT)
+    return session.get(url, **kwargs)
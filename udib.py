@@ -1,60 +1,65 @@
 #!/usr/bin/env python3
 """Main entry point for the interactive udib CLI tool."""
 
+from contextlib import ExitStack
 from pathlib import Path
 from sys import exit
 from tempfile import TemporaryDirectory
 
 from cli.clibella import Printer
 from cli.parser import get_argument_parser
-from core.utils import assert_system_dependencies_installed, download_and_verify_debian_iso
-from iso.injection import inject_files_into_iso
-from net.download import download_file
-from net.scrape import get_debian_preseed_file_urls, get_debian_iso_urls
+from core.exceptions import MissingDependencyError
+from core.utils import assert_system_dependencies_installed
 
 
 def main():
 
-    # check for dependencies
-    assert_system_dependencies_installed()
     # create a CLI printer
     p = Printer()
     # create an argument parser and read arguments
     parser = get_argument_parser()
     args = parser.parse_args()
 
-    # parse and verify output file if sepcified
-    if args.path_to_output_file:
-        path_to_output_file = Path(args.path_to_output_file)
-        if "~" in str(path_to_output_file):
-            path_to_output_file = path_to_output_file.expanduser()
-        path_to_output_file = path_to_output_file.resolve()
-
-        if path_to_output_file.exists():
-            p.error(f"Output file already exists: '{path_to_output_file}'.")
-            exit(1)
-    else:
-        path_to_output_file = None
-
-    # parse and verify output dir if sepcified
-    if args.path_to_output_dir:
-        path_to_output_dir = Path(args.path_to_output_dir)
-        if "~" in str(path_to_output_dir):
-            path_to_output_dir = path_to_output_dir.expanduser()
-        path_to_output_dir = path_to_output_dir.resolve()
-
-        if not path_to_output_dir.is_dir():
-            p.error(f"No such directory: '{path_to_output_dir}'.")
-            exit(1)
+    # check for the programs required by the chosen subcommand
+    getting_iso = args.subparser_name == "get" and args.WHAT == "iso"
+    if getting_iso:
+        required_programs = ["gpg"]
+    elif args.subparser_name == "inject":
+        required_programs = ["xorriso", "gpg"]
     else:
-        path_to_output_dir = None
-
+        required_programs = []
+    try:
+        assert_system_dependencies_installed(required_programs)
+    except MissingDependencyError as e:
+        p.error(str(e))
+        exit(1)
+
+    # verify output file if specified, an existing regular file is checked
+    # and reused by 'get iso' instead
+    path_to_output_file = args.path_to_output_file
+    if (path_to_output_file and path_to_output_file.exists()
+            and not (getting_iso and path_to_output_file.is_file())):
+        p.error(f"Output file already exists: '{path_to_output_file}'.")
+        exit(1)
+
+    # verify output dir if specified
+    path_to_output_dir = args.path_to_output_dir
+    if path_to_output_dir and not path_to_output_dir.is_dir():
+        p.error(f"No such directory: '{path_to_output_dir}'.")
+        exit(1)
+
+    # the networking and ISO modules are only imported by the subcommands
+    # which need them, which keeps '--help' and argument errors fast
     if args.subparser_name == "get":
+        from net.download import download_file
+        from net.scrape import get_debian_preseed_file_urls
+
         if args.WHAT == "preseed-file-basic":
             # download the basic example preseedfile
 
+            preseed_file = get_debian_preseed_file_urls()["basic"]
             if not path_to_output_file:
-                output_file_name = get_debian_preseed_file_urls()["basic"]["name"]
+                output_file_name = preseed_file["name"]
                 if path_to_output_dir:
                     path_to_output_file = path_to_output_dir / output_file_name
                 else:
@@ -63,7 +68,7 @@ def main():
             p.info("Retrieving basic preseed example file...")
             download_file(
                 path_to_output_file,
-                get_debian_preseed_file_urls()["basic"]["url"],
+                preseed_file["url"],
                 show_progress=False,
                 printer=p,
             )
@@ -75,8 +80,9 @@ def main():
         elif args.WHAT == "preseed-file-full":
             # download the full example preseedfile
 
+            preseed_file = get_debian_preseed_file_urls()["full"]
             if not path_to_output_file:
-                output_file_name = get_debian_preseed_file_urls()["full"]["name"]
+                output_file_name = preseed_file["name"]
                 if path_to_output_dir:
                     path_to_output_file = path_to_output_dir / output_file_name
                 else:
@@ -85,7 +91,7 @@ def main():
             p.info("Retrieving full preseed example file...")
             download_file(
                 path_to_output_file,
-                get_debian_preseed_file_urls()["full"]["url"],
+                preseed_file["url"],
                 show_progress=False,
                 printer=p,
             )
@@ -95,6 +101,9 @@ def main():
             exit(0)
 
         elif args.WHAT == "iso":
+            from core.utils import download_and_verify_debian_iso
+            from net.scrape import get_debian_iso_urls
+
             # download and verify installation image
             p.info("Downloading latest Debian stable x86-64 netinst ISO...")
 
@@ -105,11 +114,19 @@ def main():
                 else:
                     path_to_output_file = Path.cwd() / output_file_name
 
-            download_and_verify_debian_iso(path_to_output_file, printer=p)
+            try:
+                download_and_verify_debian_iso(path_to_output_file, printer=p)
+            except FileExistsError as e:
+                p.error(str(e))
+                exit(1)
             p.success(f"Debian ISO saved to '{path_to_output_file}'.")
             exit(0)
 
     elif args.subparser_name == "inject":
+        from core.utils import download_and_verify_debian_iso
+        from iso.injection import inject_files_into_iso
+        from net.scrape import get_debian_iso_urls
+
         image_file_name = Path(get_debian_iso_urls()["image_file"]["name"])
         if not path_to_output_file:
             output_file_name = image_file_name.stem + "-modified" + image_file_name.suffix
@@ -119,46 +136,36 @@ def main():
                 path_to_output_file = Path.cwd() / output_file_name
 
         # verify input file paths
-        input_file_paths = []
-        for path in args.FILES:
-            path = Path(path)
-            if "~" in str(path):
-                path = Path(path).expanduser()
-            path = Path(path).resolve()
+        input_file_paths = args.FILES
+        for path in input_file_paths:
             if not path.is_file():
                 p.error(f"No such file: '{path}'.")
                 exit(1)
-            input_file_paths.append(path)
 
         # verify image file path if set by user or download fresh iso if unset
-        temp_iso_dir = None
-        if args.path_to_image_file:
-            path_to_image_file = Path(args.path_to_image_file)
-            if "~" in str(path_to_image_file):
-                path_to_image_file = Path(path_to_image_file).expanduser()
-            path_to_image_file = Path(path_to_image_file).resolve()
-            if not path_to_image_file.is_file():
-                p.error(f"No such file: '{path_to_image_file}'.")
-                exit(1)
-        else:
-            # download a Debian ISO to a temporary directory
-            p.info("Downloading the latest Debian x86-64 netinst image...")
-            temp_iso_dir = TemporaryDirectory()
-            path_to_iso_dir = Path(temp_iso_dir.name)
-            path_to_image_file = path_to_iso_dir/image_file_name
-            download_and_verify_debian_iso(path_to_image_file, printer=p)
-
-        # inject the input files
-        inject_files_into_iso(
-            path_to_output_file,
-            path_to_image_file,
-            input_file_paths,
-            printer=p,
-        )
-
-        # clear out temporary directory if one was created earlier
-        if temp_iso_dir:
-            temp_iso_dir.cleanup()
+        with ExitStack() as temp_dirs:
+            if args.path_to_image_file:
+                path_to_image_file = args.path_to_image_file
+                if not path_to_image_file.is_file():
+                    p.error(f"No such file: '{path_to_image_file}'.")
+                    exit(1)
+            else:
+                # download a Debian ISO to a temporary directory, which is
+                # removed again once the injection is done or has failed
+                p.info("Downloading the latest Debian x86-64 netinst image...")
+                path_to_iso_dir = Path(temp_dirs.enter_context(
+                    TemporaryDirectory()
+                ))
+                path_to_image_file = path_to_iso_dir/image_file_name
+                download_and_verify_debian_iso(path_to_image_file, printer=p)
+
+            # inject the input files
+            inject_files_into_iso(
+                path_to_output_file,
+                path_to_image_file,
+                input_file_paths,
+                printer=p,
+            )
 
         exit(0)
 